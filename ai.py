@@ -1,68 +1,305 @@
 import os
+import random
 import time
 import asyncio
+import functools
+import importlib.util
 import logging
-from typing import Optional
+import socket
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
-from openai import OpenAI, OpenAIError
+import httpx
+from openai import APIConnectionError, AsyncOpenAI, OpenAIError
 
 RETRY_STATUS = {429, 500, 502, 503, 504}
-MODEL = os.getenv("OPENAI_MODEL", "gpt-5-nano")
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_S = 1.0
+BACKOFF_CAP_S = 30.0
+DEFAULT_MODEL = "gpt-5-nano"
 PRICE_PER_1K_TOKENS = 0.0005  # USD, estimasi kasar
-CLIENT: Optional[OpenAI] = None
+# Prefix statis & identik byte-per-byte agar prompt caching sisi server bisa
+# dipakai; jangan sisipkan data dinamis ke sini.
+CLASSIFY_SYSTEM_MSG = (
+    "Kamu mengklasifikasikan teks menjadi 'penjual', 'pembeli', atau 'lainnya'. "
+    "Jawab hanya salah satu kata itu."
+)
+LABEL_SELLER = "penjual"
+LABEL_BUYER = "pembeli"
+LABEL_OTHER = "lainnya"
+LABELS = (LABEL_SELLER, LABEL_BUYER, LABEL_OTHER)
+_LABEL_LOOKUP = {label: label for label in LABELS}
+# Cukup untuk label terpanjang setelah tokenisasi BPE; max_tokens=1 memotong
+# "pembeli"/"penjual" menjadi potongan awal yang ambigu.
+CLASSIFY_MAX_TOKENS = 4
+# Satu-satunya cache label (dipakai juga oleh twt untuk lookup & sweep).
+CLASSIFY_CACHE_MAX = 10_000
+CLASSIFY_CACHE_TTL_S = 86_400.0  # 24 jam; ubah lewat set_cache_ttl
+CLASSIFY_KEY_CHARS = 1000
+CLASSIFY_CACHE: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+# Permintaan yang sedang berjalan per kunci cache; pemanggil lain dengan teks
+# sama cukup menunggu hasil yang sama.
+_INFLIGHT: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+CLIENT: Optional[AsyncOpenAI] = None
 
+# Satu pool koneksi dipakai ulang untuk semua panggilan agar TCP/TLS tidak
+# dibangun ulang setiap request.
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+# Payload klasifikasi sangat kecil: matikan Nagle dan multipleks lewat HTTP/2
+# bila paket `h2` terpasang.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+SOCKET_OPTIONS = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+_KEY_WARNED = False
 
-async def ask_ai(system_msg: str, user_msg: str, *, max_tokens: int = 16, timeout: float = 15.0) -> Optional[str]:
-    """Kirim pesan ke OpenAI Chat Completions API dan kembalikan konten balasan."""
+
+def _get_client(timeout: float) -> Optional[AsyncOpenAI]:
+    """Buat klien sekali; OPENAI_API_KEY hanya dibaca sampai klien tersedia."""
+    global CLIENT, HTTP_CLIENT, _KEY_WARNED
+    if CLIENT is not None:
+        return CLIENT
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        logging.warning("OPENAI_API_KEY tidak ditemukan; melewati panggilan AI")
+        if not _KEY_WARNED:
+            logging.warning("OPENAI_API_KEY tidak ditemukan; melewati panggilan AI")
+            _KEY_WARNED = True
+        return None
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, socket_options=SOCKET_OPTIONS
+    )
+    HTTP_CLIENT = httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(timeout))
+    # retry ditangani _complete (backoff + jitter); matikan retry bawaan SDK
+    # agar satu kegagalan tidak berlipat menjadi puluhan request
+    CLIENT = AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=0, http_client=HTTP_CLIENT)
+    return CLIENT
+
+
+async def warmup(timeout: float = 5.0) -> None:
+    """Buka koneksi (DNS+TCP+TLS) lebih awal agar panggilan pertama tidak lambat."""
+    client = _get_client(timeout)
+    if client is None:
+        return
+    try:
+        await client.models.retrieve(_get_model_name(), timeout=timeout)
+    except Exception as e:
+        logging.debug("OpenAI warmup failed: %s", e)
+
+
+async def aclose() -> None:
+    """Tutup pool koneksi bersama (aman dipanggil berulang)."""
+    global CLIENT, HTTP_CLIENT
+    if HTTP_CLIENT is not None:
+        await HTTP_CLIENT.aclose()
+    HTTP_CLIENT = None
+    CLIENT = None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model_name() -> str:
+    """Nama model dibaca sekali (setelah .env dimuat) lalu dipakai ulang."""
+    return os.getenv("OPENAI_MODEL", "").strip() or DEFAULT_MODEL
+
+
+def reset_model_cache() -> None:
+    _get_model_name.cache_clear()
+
+
+@functools.lru_cache(maxsize=8)
+def _system_entry(system_msg: str) -> Dict[str, str]:
+    """Entri pesan sistem dibangun sekali per prompt; SDK tidak memodifikasinya."""
+    return {"role": "system", "content": system_msg}
+
+
+def _retry_after(exc: OpenAIError) -> Optional[float]:
+    """Baca header Retry-After (detik) dari respons error bila ada."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
         return None
 
-    global CLIENT
-    if CLIENT is None:
-        CLIENT = OpenAI(api_key=api_key)
 
-    backoff = 1
-    for attempt in range(5):
-        start = time.perf_counter()
+def _backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Backoff eksponensial dengan full jitter agar retry tidak serempak."""
+    cap = min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2**attempt)
+    delay = random.uniform(0, cap)
+    if retry_after is not None:
+        delay = max(retry_after, delay)
+    return delay
+
+
+def _log_usage(resp: Any, elapsed: float) -> None:
+    usage = getattr(resp, "usage", None)
+    total_tokens = getattr(usage, "total_tokens", 0) if usage else 0
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    cost = total_tokens / 1000 * PRICE_PER_1K_TOKENS
+    logging.info(
+        "OpenAI tokens=%d cached=%d cost_est=$%.6f time=%.2fs",
+        total_tokens,
+        cached_tokens,
+        cost,
+        elapsed,
+    )
+
+
+async def _complete(system_msg: str, user_msg: str, *, max_tokens: int, timeout: float) -> Optional[str]:
+    """Panggil Chat Completions dengan retry; kembalikan konten mentah tanpa diolah."""
+    client = _get_client(timeout)
+    if client is None:
+        return None
+
+    log_usage = logging.getLogger().isEnabledFor(logging.INFO)
+    for attempt in range(MAX_ATTEMPTS):
+        start = time.perf_counter() if log_usage else 0.0
         try:
-            resp = await asyncio.to_thread(
-                CLIENT.chat.completions.create,
-                model=MODEL,
-                messages=[
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": user_msg},
-                ],
+            resp = await client.chat.completions.create(
+                model=_get_model_name(),
+                messages=[_system_entry(system_msg), {"role": "user", "content": user_msg}],
                 temperature=0,
                 max_tokens=max_tokens,
+                timeout=timeout,
             )
-            content = resp.choices[0].message.content.strip()
-            usage = getattr(resp, "usage", None)
-            total_tokens = getattr(usage, "total_tokens", 0) if usage else 0
-            cost = total_tokens / 1000 * PRICE_PER_1K_TOKENS
-            elapsed = time.perf_counter() - start
-            logging.info(
-                "OpenAI tokens=%d cost_est=$%.6f time=%.2fs", total_tokens, cost, elapsed
-            )
+            content = resp.choices[0].message.content
+            if log_usage:
+                _log_usage(resp, time.perf_counter() - start)
             return content
         except OpenAIError as e:
             status = getattr(e, "status_code", None)
             logging.warning("OpenAI request failed: %s", e)
-            if attempt == 4 or status not in RETRY_STATUS:
+            retryable = status in RETRY_STATUS or isinstance(e, APIConnectionError)
+            if attempt == MAX_ATTEMPTS - 1 or not retryable:
                 return None
-            await asyncio.sleep(backoff)
-            backoff *= 2
+            await asyncio.sleep(_backoff_delay(attempt, _retry_after(e)))
         except Exception as e:
             logging.warning("OpenAI request failed: %s", e)
             return None
     return None
 
 
+async def ask_ai(system_msg: str, user_msg: str, *, max_tokens: int = 16, timeout: float = 15.0) -> Optional[str]:
+    """Kirim pesan ke OpenAI Chat Completions API dan kembalikan konten balasan."""
+    content = await _complete(system_msg, user_msg, max_tokens=max_tokens, timeout=timeout)
+    return content.strip() if content is not None else None
+
+
+def _match_label(content: str) -> str:
+    """Petakan jawaban model ke salah satu LABELS; jawaban lain dianggap 'lainnya'."""
+    exact = _LABEL_LOOKUP.get(content)
+    if exact is not None:
+        return exact
+    word = content.strip().strip("'\".,!").lower()
+    if word:
+        matches = [label for label in LABELS if label.startswith(word) or word.startswith(label)]
+        if len(matches) == 1:
+            return matches[0]
+    return LABEL_OTHER
+
+
+def _cache_key(text: str) -> str:
+    return " ".join(text.lower().split())[:CLASSIFY_KEY_CHARS]
+
+
+def _cache_get(key: str) -> Optional[str]:
+    hit = CLASSIFY_CACHE.get(key)
+    if hit is None:
+        return None
+    label, stored = hit
+    if time.monotonic() - stored >= CLASSIFY_CACHE_TTL_S:
+        del CLASSIFY_CACHE[key]
+        return None
+    CLASSIFY_CACHE.move_to_end(key)
+    return label
+
+
+def cached_label(text: str) -> Optional[str]:
+    """Label tersimpan untuk *text* bila masih dalam TTL (tanpa panggilan API)."""
+    return _cache_get(_cache_key(text))
+
+
+def set_cache_ttl(ttl_s: float) -> None:
+    global CLASSIFY_CACHE_TTL_S
+    CLASSIFY_CACHE_TTL_S = float(ttl_s)
+
+
+def cache_sweep() -> int:
+    """Buang semua entri yang melewati TTL; kembalikan jumlahnya.
+
+    Urutan LRU mengikuti akses terakhir, bukan waktu simpan, jadi seluruh
+    isi perlu diperiksa.
+    """
+    now = time.monotonic()
+    expired = [k for k, (_, stored) in CLASSIFY_CACHE.items() if now - stored >= CLASSIFY_CACHE_TTL_S]
+    for key in expired:
+        del CLASSIFY_CACHE[key]
+    return len(expired)
+
+
+def _cache_put(key: str, label: str) -> None:
+    CLASSIFY_CACHE[key] = (label, time.monotonic())
+    CLASSIFY_CACHE.move_to_end(key)
+    if len(CLASSIFY_CACHE) > CLASSIFY_CACHE_MAX:
+        CLASSIFY_CACHE.popitem(last=False)
+
+
 async def classify_text(text: str, *, timeout_ms: int = 4000) -> Optional[str]:
-    """Klasifikasikan teks menjadi 'penjual', 'pembeli', atau 'lainnya'."""
-    system_msg = (
-        "Kamu mengklasifikasikan teks menjadi 'penjual', 'pembeli', atau 'lainnya'. "
-        "Jawab hanya salah satu kata itu."
-    )
-    return await ask_ai(system_msg, text, max_tokens=1, timeout=timeout_ms / 1000)
+    """Klasifikasikan teks menjadi salah satu LABELS ('penjual', 'pembeli', 'lainnya').
+
+    Hasil sukses disimpan di cache LRU ber-TTL sehingga teks yang sama
+    (setelah huruf kecil & spasi dirapikan) tidak memanggil API lagi, dan
+    panggilan serentak untuk teks yang sama digabung menjadi satu request.
+    """
+    key = _cache_key(text)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    pending = _INFLIGHT.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    fut: "asyncio.Future[Optional[str]]" = asyncio.get_running_loop().create_future()
+    _INFLIGHT[key] = fut
+    try:
+        content = await _complete(
+            CLASSIFY_SYSTEM_MSG, text, max_tokens=CLASSIFY_MAX_TOKENS, timeout=timeout_ms / 1000
+        )
+        label = _match_label(content) if content is not None else None
+        if label is not None:
+            _cache_put(key, label)
+        fut.set_result(label)
+        return label
+    finally:
+        if not fut.done():
+            fut.set_result(None)
+        _INFLIGHT.pop(key, None)
+
+
+async def classify_texts(
+    texts: List[str], *, timeout_ms: int = 4000, concurrency: int = 8
+) -> List[Tuple[Optional[str], int]]:
+    """Klasifikasikan banyak teks sekaligus dengan paralelisme terbatas.
+
+    Urutan hasil mengikuti *texts*; tiap hasil berupa ``(label, latency_ms)``
+    dan kegagalan per teks menjadi label ``None``.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(text: str) -> Tuple[Optional[str], int]:
+        async with sem:
+            start = time.perf_counter()
+            label = await classify_text(text, timeout_ms=timeout_ms)
+            return label, int((time.perf_counter() - start) * 1000)
+
+    results = await asyncio.gather(*(_one(t) for t in texts), return_exceptions=True)
+    labels: List[Tuple[Optional[str], int]] = []
+    for res in results:
+        if isinstance(res, BaseException):
+            logging.warning("OpenAI classification failed: %s", res)
+            labels.append((None, 0))
+        else:
+            labels.append(res)
+    return labels
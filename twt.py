@@ -14,19 +14,25 @@ Fitur utama:
 from __future__ import annotations
 
 import asyncio
+import atexit
+import functools
 import json
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import signal
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
 import tempfile
 import time
 import unicodedata
+from collections import OrderedDict, defaultdict, deque
 import threading
 import traceback
 from dataclasses import dataclass, field
+from operator import attrgetter
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, DefaultDict, Deque, Dict, List, Optional, Sequence, Tuple, Union
 
 from urllib.parse import quote
 
@@ -40,7 +46,26 @@ from rich.table import Table
 from rich.text import Text
 from rich.spinner import Spinner
 
-from ai import classify_text
+try:  # serializer JSON berbasis C; opsional
+    import orjson
+except ImportError:  # pragma: no cover - fallback ke json bawaan
+    orjson = None
+
+try:  # automaton Aho-Corasick (pyahocorasick); opsional
+    import ahocorasick
+except ImportError:  # pragma: no cover - fallback ke pencarian substring
+    ahocorasick = None
+
+from ai import (
+    CLASSIFY_CACHE as AI_CACHE,
+    LABEL_BUYER,
+    aclose as close_ai,
+    cache_sweep as ai_cache_sweep,
+    cached_label,
+    classify_texts,
+    set_cache_ttl as set_ai_cache_ttl,
+    warmup as warmup_ai,
+)
 
 console = Console()
 
@@ -48,6 +73,12 @@ console = Console()
 
 CONFIG_PATH = "bot_config.json"
 REPLIED_LOG = "replied_ids.json"
+REPLIED_JOURNAL = "replied_ids.jsonl"
+REPLIED_COMPACT_EVERY = 500
+REPLIED_APPENDS = 0
+REPLIED_FD: Optional[int] = None
+# fdatasync cukup untuk append (metadata tak perlu disinkron); tidak ada di semua OS
+_fdatasync = getattr(os, "fdatasync", os.fsync)
 SESSION_DIR = "bot_session"
 COOKIE_FILE = "session.json"
 
@@ -55,12 +86,15 @@ DEFAULT_SCAN = {
     "scan_interval_ms": 1500,
     "no_new_cycles_before_refresh": 6,
     "max_age_hours": 3,
+    "max_articles_per_cycle": 30,
+    "max_scan_interval_ms": 10000,
 }
 
 DEFAULT_NETWORK = {
     "timeout_ms": 15000,
     "max_retries": 3,
     "retry_backoff_ms": 1200,
+    "block_resources": False,
 }
 
 DEFAULT_REPLY = {
@@ -85,35 +119,156 @@ DEFAULT_LOGGING = {
     "error_file": "logs/error.log",
 }
 
-# Default search URL akan dibangun ulang dari config
-SEARCH_URL = "https://x.com/search?q=chatgpt%20%23zonauang&src=recent_search_click&f=live"
 LOGIN_URL = "https://x.com/i/flow/login"
 
-AI_CACHE_TTL_MS = 86_400_000  # 24 jam
-AI_CACHE: Dict[str, Tuple[str, int]] = {}
+# Sumber daya yang tidak dibutuhkan untuk membaca teks tweet (network.block_resources).
+# Stylesheet sengaja tidak diblokir: login manual & composer butuh CSS.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+BLOCKED_URL_HINTS = ("doubleclick", "google-analytics", "googletagmanager", "analytics.tiktok")
+
+_UTC = timezone.utc
+ISO_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+SEEN_IDS_MAX = 20_000
+SCAN_BACKOFF_FACTOR = 1.5  # pengali jeda scan tiap siklus tanpa kandidat baru
+TIMER_WINDOW = 10  # jumlah sampel durasi terakhir yang disimpan per timer
+ACTIVITY_MAX = 10  # baris log aktivitas yang disimpan untuk dashboard
+DASH_LOG_LINES = 5  # baris log aktivitas yang ditampilkan
+
+AI_CACHE_TTL_MS = 86_400_000  # 24 jam, bisa diganti lewat ai_cache_ttl_ms
+AI_CACHE_SWEEP_EVERY = 50  # siklus antar pembersihan entri kedaluwarsa
 
 EVENT_JOURNAL: "EventJournal" | None = None
-EARLY_EVENTS: List[Dict[str, Any]] = []
+LOG_LISTENER: QueueListener | None = None
+# level log aktif; event di bawahnya (dan di bawah WARNING) tidak dibangun sama sekali
+LOG_LEVEL = logging.NOTSET
+EVENT_BATCH_MAX = 128
+EVENT_FLUSH_S = 0.05  # batas waktu sejak baris pertama antre sampai batch ditulis
+EARLY_EVENTS: List[str] = []
 
 ENV_FILE = ".env"
+ENV_CACHE: Dict[str, Dict[str, str]] = {}  # path -> isi .env yang sudah di-parse
+
+
+JournalLine = Union[str, Callable[[], str]]
 
 
 class EventJournal:
-    """Sederhana: mencatat event ke file JSONL agar mudah ditelusuri."""
+    """Mencatat event ke file JSONL; penulisan digabung per batch di thread latar.
+
+    ``append`` hanya memasukkan baris ke antrean. Thread penulis menguras
+    antrean (maks. ``EVENT_BATCH_MAX`` baris atau ``EVENT_FLUSH_S`` detik)
+    lalu menulisnya sekaligus ke descriptor O_APPEND yang tetap terbuka.
+    Record lain (decisions.log, cycles.log) bisa menumpang lewat
+    ``append_line(line, path)``. ``append_deferred`` menerima fungsi yang
+    baru dipanggil di thread penulis, untuk baris yang mahal dibentuk
+    (misalnya traceback).
+    """
 
     def __init__(self, path: str):
         self.path = path
         directory = os.path.dirname(path)
         if directory:
             os.makedirs(directory, exist_ok=True)
-        self._lock = threading.Lock()
+        self._fds: Dict[str, int] = {path: self._open(path)}
+        self._queue: "queue.Queue[Optional[Tuple[str, JournalLine]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="event-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
 
     def append(self, payload: Dict[str, Any]) -> None:
-        line = json.dumps(payload, ensure_ascii=False, default=_json_default)
-        with self._lock:
-            with open(self.path, "a", encoding="utf-8") as fh:
-                fh.write(line)
-                fh.write("\n")
+        self.append_line(dumps_json(payload))
+
+    def append_line(self, line: str, path: Optional[str] = None) -> None:
+        """Antrekan satu baris JSON yang sudah diserialisasi (bawaan: file jurnal)."""
+        self._queue.put((path or self.path, line + "\n"))
+
+    def append_deferred(self, build: Callable[[], str], path: Optional[str] = None) -> None:
+        """Antrekan baris yang dibentuk *build* di thread penulis."""
+        self._queue.put((path or self.path, build))
+
+    def _writer(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            # batas waktu dihitung dari baris pertama, jadi aliran event yang
+            # terus-menerus tetap ditulis paling lambat EVENT_FLUSH_S kemudian
+            deadline = time.monotonic() + EVENT_FLUSH_S
+            while len(batch) < EVENT_BATCH_MAX:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    @staticmethod
+    def _open(path: str) -> int:
+        # O_APPEND: setiap write mendarat utuh di akhir file tanpa seek/lock
+        return os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _flush(self, batch: List[Tuple[str, JournalLine]]) -> None:
+        lines: Dict[str, List[str]] = {}
+        for path, line in batch:
+            if line.__class__ is not str:
+                try:
+                    line = line() + "\n"
+                except Exception as exc:
+                    logging.warning("Gagal membentuk baris log %s: %s", path, exc)
+                    continue
+            lines.setdefault(path, []).append(line)
+        for path, chunk in lines.items():
+            try:
+                fd = self._fds.get(path)
+                if fd is None:
+                    fd = self._fds[path] = self._open(path)
+                data = memoryview("".join(chunk).encode("utf-8"))
+                while data:
+                    data = data[os.write(fd, data):]
+            except OSError as exc:
+                # lewat logging (QueueListener), bukan log_event, agar tidak kembali ke jurnal
+                logging.warning("Gagal menulis log %s: %s", path, exc)
+
+    def close(self) -> None:
+        """Kuras antrean lalu tutup semua file (aman dipanggil berulang)."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+
+
+def _parse_env(path: str) -> Dict[str, str]:
+    """Baca file .env sekali; baris kosong dan komentar dilewati.
+
+    Hasil disimpan di ENV_CACHE per path sehingga load_env dan ensure_api_key
+    tidak mem-parse file yang sama dua kali.
+    """
+    cached = ENV_CACHE.get(path)
+    if cached is not None:
+        return cached
+    parsed: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, val = line.split("=", 1)
+            parsed[key.strip()] = val.strip()
+    ENV_CACHE[path] = parsed
+    return parsed
 
 
 def load_env() -> None:
@@ -121,15 +276,11 @@ def load_env() -> None:
     if not os.path.exists(ENV_FILE):
         log_event("env_missing", level=logging.DEBUG, path=ENV_FILE)
         return
-    loaded = 0
     try:
-        with open(ENV_FILE, encoding="utf-8") as f:
-            for line in f:
-                if "=" in line:
-                    key, val = line.strip().split("=", 1)
-                    os.environ.setdefault(key, val)
-                    loaded += 1
-        log_event("env_loaded", level=logging.DEBUG, path=ENV_FILE, entries=loaded)
+        parsed = _parse_env(ENV_FILE)
+        # variabel yang sudah ada di environment tetap diutamakan
+        os.environ.update({k: v for k, v in parsed.items() if k not in os.environ})
+        log_event("env_loaded", level=logging.DEBUG, path=ENV_FILE, entries=len(parsed))
     except OSError as exc:
         log_exception("env_load_failed", exc, path=ENV_FILE)
 
@@ -149,17 +300,11 @@ def ensure_api_key() -> bool:
         console.print("[bold red]OPENAI_API_KEY diperlukan untuk AI.[/]")
         log_event("api_key_missing_input", level=logging.WARNING)
         return False
-    env_vars: Dict[str, str] = {}
-    if os.path.exists(ENV_FILE):
-        with open(ENV_FILE, encoding="utf-8") as f:
-            for line in f:
-                if "=" in line:
-                    k, v = line.strip().split("=", 1)
-                    env_vars[k] = v
+    env_vars = dict(_parse_env(ENV_FILE)) if os.path.exists(ENV_FILE) else {}
     env_vars["OPENAI_API_KEY"] = key
     with open(ENV_FILE, "w", encoding="utf-8") as f:
-        for k, v in env_vars.items():
-            f.write(f"{k}={v}\n")
+        f.write("".join(f"{k}={v}\n" for k, v in env_vars.items()))
+    ENV_CACHE[ENV_FILE] = env_vars
     os.environ["OPENAI_API_KEY"] = key
     console.print("[green]OPENAI_API_KEY tersimpan ke .env[/]")
     log_event("api_key_saved", path=ENV_FILE)
@@ -197,6 +342,30 @@ def load_config() -> Dict[str, Any]:
     return cfg
 
 
+def stop_log_listener() -> None:
+    """Hentikan thread QueueListener setelah antreannya terkuras (aman dipanggil berulang)."""
+    global LOG_LISTENER
+    if LOG_LISTENER is not None:
+        LOG_LISTENER.stop()
+        for handler in LOG_LISTENER.handlers:
+            handler.close()
+        LOG_LISTENER = None
+
+
+atexit.register(stop_log_listener)
+
+
+class RawQueueHandler(QueueHandler):
+    """QueueHandler yang meneruskan record apa adanya.
+
+    Antrean hanya dipakai di dalam proses, jadi record tidak perlu dipickle;
+    pesan dan traceback diformat oleh handler tujuan di thread listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 def setup_logging(log_cfg: Dict[str, Any]) -> None:
     """Siapkan sistem log ke file & konsol dengan rotasi otomatis."""
     level_name = str(log_cfg.get("level", "INFO")).upper()
@@ -232,12 +401,24 @@ def setup_logging(log_cfg: Dict[str, Any]) -> None:
         handler.setFormatter(fmt)
         handler.setLevel(level if handler is not error_handler else logging.WARNING)
 
-    logging.basicConfig(level=level, handlers=[file_handler, stream_handler, error_handler], force=True)
-    global EVENT_JOURNAL
+    # Pemanggil hanya memasukkan record ke antrean; I/O file & konsol dikerjakan
+    # thread QueueListener sehingga loop utama tidak tertahan lock handler.
+    global EVENT_JOURNAL, LOG_LISTENER, LOG_LEVEL
+    LOG_LEVEL = level
+    stop_log_listener()
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = RawQueueHandler(log_queue)
+    LOG_LISTENER = QueueListener(
+        log_queue, file_handler, stream_handler, error_handler, respect_handler_level=True
+    )
+    LOG_LISTENER.start()
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    if EVENT_JOURNAL is not None:
+        EVENT_JOURNAL.close()
     EVENT_JOURNAL = EventJournal(event_file)
     if EARLY_EVENTS:
-        for entry in EARLY_EVENTS:
-            EVENT_JOURNAL.append(entry)
+        for line in EARLY_EVENTS:
+            EVENT_JOURNAL.append_line(line)
         EARLY_EVENTS.clear()
     logging.getLogger("playwright").setLevel(logging.WARNING)
     logging.info(
@@ -260,10 +441,20 @@ def _json_default(obj: Any) -> str:
     return str(obj)
 
 
+def dumps_json(data: Any) -> str:
+    """Serialisasi ke JSON satu baris; pakai orjson bila terpasang."""
+    if orjson is not None:
+        # OPT_NON_STR_KEYS: key dict non-string diterima seperti json.dumps
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, ensure_ascii=False, default=_json_default)
+
+
 def _coerce_log_level(level: Any) -> int:
     """Normalize log level input menjadi integer valid untuk logging."""
-    if isinstance(level, int):
+    if level.__class__ is int:
         return level
+    if isinstance(level, int):
+        return int(level)
     if isinstance(level, str):
         level = level.strip()
         if level.isdigit():
@@ -274,35 +465,65 @@ def _coerce_log_level(level: Any) -> int:
     return logging.INFO
 
 
+def _event_ts() -> str:
+    """Timestamp UTC per event; isoformat jauh lebih murah daripada strftime."""
+    # "+00:00" di akhir diganti "Z"
+    return datetime.now(_UTC).isoformat()[:-6] + "Z"
+
+
 def log_event(event: str, *, level: int | str = logging.INFO, **fields: Any) -> None:
     """Catat event ke log biasa dan jurnal JSONL terpisah."""
-    level = _coerce_log_level(level)
-    timestamp = datetime.utcnow().isoformat() + "Z"
+    # hampir semua pemanggil memberi konstanta logging.*; string jarang
+    if level.__class__ is not int:
+        level = _coerce_log_level(level)
+    if level < LOG_LEVEL and level < logging.WARNING:
+        return
+    timestamp = _event_ts()
     payload = {"ts": timestamp, "event": event, **fields}
-    try:
-        logging.log(level, json.dumps(payload, ensure_ascii=False, default=_json_default))
-    except TypeError:
-        safe_payload = {k: str(v) for k, v in payload.items()}
-        logging.log(level, json.dumps(safe_payload, ensure_ascii=False))
-    entry = {"severity": logging.getLevelName(level), **payload}
+    # serialisasi sekali; baris jurnal = baris log dengan "severity" di depan
+    line = _dumps_payload(payload)
+    logging.log(level, line)
+    entry = _journal_entry(level, line)
     if EVENT_JOURNAL:
-        EVENT_JOURNAL.append(entry)
+        EVENT_JOURNAL.append_line(entry)
     else:
         EARLY_EVENTS.append(entry)
 
 
+def _dumps_payload(payload: Dict[str, Any]) -> str:
+    try:
+        return dumps_json(payload)
+    except TypeError:
+        return dumps_json({k: str(v) for k, v in payload.items()})
+
+
+def _journal_entry(level: int, line: str) -> str:
+    return '{"severity":"%s",%s' % (logging.getLevelName(level), line[1:])
+
+
 def log_exception(event: str, exc: BaseException, **fields: Any) -> None:
-    tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
-    log_event(event, level=logging.ERROR, error=str(exc), traceback=tb, **fields)
+    """Catat exception sebagai event ERROR beserta traceback-nya.
 
+    Traceback tidak diformat di pemanggil: log teks menerimanya lewat
+    ``exc_info`` (diformat thread QueueListener) dan baris jurnal dibentuk
+    di thread EventJournal.
+    """
+    timestamp = _event_ts()
+    head = {"ts": timestamp, "event": event, "error": str(exc)}
+    logging.error(_dumps_payload({**head, **fields}), exc_info=exc)
+
+    def build() -> str:
+        tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        return _journal_entry(logging.ERROR, _dumps_payload({**head, "traceback": tb, **fields}))
+
+    if EVENT_JOURNAL:
+        EVENT_JOURNAL.append_deferred(build)
+    else:
+        EARLY_EVENTS.append(build())
 
-def build_search_url(cfg: Dict[str, Any]) -> str:
-    sc = cfg.get("search_config") or {}
-    keyword = sc.get("keyword", "chatgpt")
-    hashtag = sc.get("hashtag", "zonauang")
-    src = sc.get("src", "recent_search_click")
-    live = sc.get("live", True)
 
+@functools.lru_cache(maxsize=4)
+def _build_search_url_cached(keyword: str, hashtag: str, src: str, live: bool) -> str:
     query = quote(f"{keyword} #{hashtag}")
     url = f"https://x.com/search?q={query}&src={quote(src)}"
     if live:
@@ -310,67 +531,184 @@ def build_search_url(cfg: Dict[str, Any]) -> str:
     return url
 
 
-def load_replied() -> List[int]:
+def build_search_url(cfg: Dict[str, Any]) -> str:
+    sc = cfg.get("search_config") or {}
+    return _build_search_url_cached(
+        str(sc.get("keyword", "chatgpt")),
+        str(sc.get("hashtag", "zonauang")),
+        str(sc.get("src", "recent_search_click")),
+        bool(sc.get("live", True)),
+    )
+
+
+def load_replied() -> set[int]:
+    """Gabungkan snapshot REPLIED_LOG dengan jurnal append-only REPLIED_JOURNAL."""
     data = load_json(REPLIED_LOG)
-    replied = data if isinstance(data, list) else []
-    log_event("replied_loaded", count=len(replied))
+    replied = set(data) if isinstance(data, list) else set()
+    journaled = 0
+    if os.path.exists(REPLIED_JOURNAL):
+        try:
+            with open(REPLIED_JOURNAL, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        replied.add(int(json.loads(line)["id"]))
+                        journaled += 1
+                    except (ValueError, KeyError, TypeError):
+                        # baris terakhir bisa terpotong bila proses mati saat menulis
+                        continue
+        except OSError as exc:
+            log_exception("replied_journal_load_failed", exc, path=REPLIED_JOURNAL)
+    log_event("replied_loaded", count=len(replied), journaled=journaled)
+    if journaled:
+        save_replied(sorted(replied))
     return replied
 
 
 def save_replied(ids: List[int]) -> None:
+    """Tulis snapshot lengkap secara atomik lalu kosongkan jurnal."""
     tmp = REPLIED_LOG + ".tmp"
     with open(tmp, "w", encoding="utf-8") as f:
         json.dump(ids, f, ensure_ascii=False, indent=2)
         f.flush()
         os.fsync(f.fileno())
     os.replace(tmp, REPLIED_LOG)
+    if REPLIED_FD is not None:
+        os.ftruncate(REPLIED_FD, 0)
+    else:
+        with open(REPLIED_JOURNAL, "w", encoding="utf-8"):
+            pass
     log_event("replied_saved", count=len(ids))
 
 
+def append_replied(tid: int, replied: set[int]) -> None:
+    """Catat satu id ke jurnal (O(1) per balasan); ringkas tiap REPLIED_COMPACT_EVERY.
+
+    Jurnal dibuka sekali dengan O_APPEND; satu ``os.write`` kecil per id
+    bersifat atomik sehingga tidak perlu buffer maupun lock.
+    """
+    global REPLIED_APPENDS, REPLIED_FD
+    if REPLIED_FD is None:
+        REPLIED_FD = os.open(REPLIED_JOURNAL, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    os.write(REPLIED_FD, b'{"id": %d}\n' % tid)
+    _fdatasync(REPLIED_FD)
+    REPLIED_APPENDS += 1
+    if REPLIED_APPENDS >= REPLIED_COMPACT_EVERY:
+        save_replied(sorted(replied))
+        REPLIED_APPENDS = 0
+
+
+def close_replied() -> None:
+    """Tutup descriptor jurnal replied (aman dipanggil berulang)."""
+    global REPLIED_FD
+    if REPLIED_FD is not None:
+        os.close(REPLIED_FD)
+        REPLIED_FD = None
+
+
+@functools.lru_cache(maxsize=4096)
 def normalize_text(text: str) -> str:
+    # NFKC tidak mengubah teks ASCII murni; lewati normalisasi unicode
+    if text.isascii():
+        return text.lower().strip()
     return unicodedata.normalize("NFKC", text).lower().strip()
 
 
-def passes_prefilter(text: str, pos_keywords: List[str], neg_keywords: List[str]) -> bool:
+def compile_keywords(keywords: Sequence[str]) -> Tuple[str, ...]:
+    """Ringkas daftar kata kunci (sudah dinormalisasi) untuk pencocokan substring.
+
+    Kata kunci yang memuat kata kunci lain di daftar yang sama tidak pernah
+    mengubah hasil ``any(k in text ...)`` sehingga dibuang; hasilnya urut dari
+    yang terpendek agar pencocokan cepat berhenti.
+    """
+    compact: List[str] = []
+    for kw in sorted(set(keywords), key=len):
+        if not any(short in kw for short in compact):
+            compact.append(kw)
+    return tuple(compact)
+
+
+# Di bawah jumlah ini `any(k in text ...)` masih lebih cepat daripada automaton.
+AC_MIN_KEYWORDS = 16
+
+
+class KeywordMatcher:
+    """Cek apakah teks memuat salah satu kata kunci.
+
+    Daftar panjang dikompilasi menjadi satu automaton Aho-Corasick (satu kali
+    lintasan teks) bila pyahocorasick terpasang; selain itu dipakai pencarian
+    substring atas daftar yang sudah diringkas ``compile_keywords``.
+    """
+
+    __slots__ = ("keywords", "_automaton")
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = compile_keywords(keywords)
+        self._automaton = None
+        if ahocorasick is not None and len(self.keywords) >= AC_MIN_KEYWORDS:
+            automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                automaton.add_word(kw, kw)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def search(self, text: str) -> bool:
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return any(k in text for k in self.keywords)
+
+
+def passes_prefilter(text: str, pos_keywords: KeywordMatcher, neg_keywords: KeywordMatcher) -> bool:
     """Return True if normalized *text* matches positive keywords and none of the negative ones."""
     if not text or len(text) < 5:
         return False
-    if not any(k in text for k in pos_keywords):
+    if not pos_keywords.search(text):
         return False
-    if any(n in text for n in neg_keywords):
+    if neg_keywords.search(text):
         return False
     return True
 
 
+PAGE_PROBE_JS = """(loginSelector) => ({
+    profile: document.querySelector(loginSelector) !== null,
+    captcha: document.querySelector("iframe[src*='captcha']") !== null,
+})"""
+
+
+async def probe_page(page) -> Dict[str, bool]:
+    """Cek indikator login dan CAPTCHA dalam satu round-trip."""
+    try:
+        return await page.evaluate(PAGE_PROBE_JS, LOGIN_INDICATOR_SEL)
+    except Exception as exc:
+        log_event("page_probe_failed", level=logging.DEBUG, error=str(exc))
+        return {"profile": False, "captcha": False}
+
+
 async def wait_for_manual_captcha() -> None:
     console.print("[bold yellow]⚠️ CAPTCHA terdeteksi. Selesaikan di browser dan tekan Enter…[/]")
     await asyncio.to_thread(input)
     log_event("captcha_resolved")
 
 
-async def detect_captcha(page, stats: Optional[Dict[str, int]] = None) -> None:
+async def detect_captcha(page, stats: Optional[Stats] = None) -> None:
     u = page.url.lower()
-    if "captcha" in u or "challenge" in u:
-        if stats is not None:
-            stats["captcha"] = stats.get("captcha", 0) + 1
-        log_event("captcha_detected", url=page.url)
-        await wait_for_manual_captcha()
+    # URL tantangan sudah cukup; lewati evaluate sama sekali
+    url_challenge = "captcha" in u or "challenge" in u
+    if not url_challenge and not (await probe_page(page))["captcha"]:
         return
-    try:
-        if await page.query_selector("iframe[src*='captcha']"):
-            if stats is not None:
-                stats["captcha"] = stats.get("captcha", 0) + 1
-            log_event("captcha_detected", url=page.url)
-            await wait_for_manual_captcha()
-    except TimeoutError:
-        pass
+    if stats is not None:
+        stats.inc("captcha")
+    log_event("captcha_detected", url=page.url)
+    await wait_for_manual_captcha()
 
 
-async def detect_rate_limit(page, stats: Optional[Dict[str, int]] = None) -> bool:
+async def detect_rate_limit(page, stats: Optional[Stats] = None) -> bool:
+    # selector teks persis: hanya elemen berisi pesan itu saja, bukan tweet yang mengutipnya
     try:
         if await page.query_selector("text='Rate limit exceeded'"):
             if stats is not None:
-                stats["rate"] = stats.get("rate", 0) + 1
+                stats.inc("rate")
             log_event("rate_limit", url=page.url)
             return True
     except TimeoutError:
@@ -381,30 +719,105 @@ async def detect_rate_limit(page, stats: Optional[Dict[str, int]] = None) -> boo
 # ------------------- Data kelas -------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class Candidate:
     tid: int
     author: str
-    created_at: datetime
+    created_ms: int  # epoch milidetik (UTC)
     element: Any
     text: str
+    norm_text: str = ""
+    can_reply: bool = True  # tombol balas ada & aktif saat dipindai
 
 
-@dataclass
+@dataclass(slots=True)
 class ReplyResult:
     action: str  # "reply" atau "skip"
     reason: str
     durations: Dict[str, int] = field(default_factory=dict)
 
 
+class Stats:
+    """Penghitung statistik plus jendela durasi terakhir per timer."""
+
+    __slots__ = ("counts", "timers", "_dirty")
+
+    def __init__(self, window: int = TIMER_WINDOW):
+        self.counts: DefaultDict[str, int] = defaultdict(int)
+        self.timers: DefaultDict[str, Deque[int]] = defaultdict(lambda: deque(maxlen=window))
+        self._dirty: set[str] = set()
+
+    def inc(self, key: str, n: int = 1) -> None:
+        self.counts[key] += n
+        self._dirty.add(key)
+
+    def set(self, key: str, value: int) -> None:
+        if self.counts.get(key) != value:
+            self.counts[key] = value
+            self._dirty.add(key)
+
+    def get(self, key: str) -> int:
+        return self.counts.get(key, 0)
+
+    def time(self, key: str, ms: int) -> None:
+        self.timers[key].append(ms)
+
+    def changed(self) -> Dict[str, int]:
+        """Nilai total penghitung yang berubah sejak pemanggilan terakhir.
+
+        Pembaca cukup menggabungkan (``dict.update``) tiap hasil untuk
+        memperoleh snapshot lengkap.
+        """
+        if not self._dirty:
+            return {}
+        counts = self.counts
+        out = {k: counts[k] for k in self._dirty}
+        self._dirty.clear()
+        return out
+
+
+class LruSet:
+    """Set berkapasitas tetap; anggota paling lama tidak disentuh dibuang saat penuh."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[int, None]" = OrderedDict()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, key: int) -> bool:
+        """Tambahkan *key*; kembalikan True bila sebelumnya belum ada."""
+        if key in self._items:
+            self._items.move_to_end(key)
+            return False
+        self._items[key] = None
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return True
+
+
 # ----------------- Login & navigasi -----------------
 
 
+# Selector yang dipakai berulang; disimpan sekali sebagai konstanta.
+SEL_PROFILE = "[data-testid='AppTabBar_Profile_Link']"
+SEL_ARTICLE = "article"
+SEL_REPLY_BTN = "[data-testid='reply']"
+SEL_COMPOSER = "div[role='textbox']"
+SEL_SUBMIT = "[data-testid='tweetButton']"
+SEL_TOAST = "[data-testid='toast']"
+
 LOGIN_INDICATORS = [
-    "[data-testid='AppTabBar_Profile_Link']",
+    SEL_PROFILE,
     "[data-testid='SideNav_AccountSwitcher_Button']",
     "[data-testid='AccountSwitcher_Button']",
 ]
+# satu selector gabungan: cukup satu querySelector untuk semua indikator
+LOGIN_INDICATOR_SEL = ", ".join(LOGIN_INDICATORS)
 
 
 async def is_logged_in(page) -> bool:
@@ -417,15 +830,7 @@ async def is_logged_in(page) -> bool:
     except Exception as exc:
         log_event("login_cookie_check_failed", level=logging.DEBUG, error=str(exc))
 
-    for selector in LOGIN_INDICATORS:
-        try:
-            if await page.query_selector(selector):
-                return True
-        except TimeoutError:
-            continue
-        except Exception as exc:
-            log_event("login_indicator_check_failed", level=logging.DEBUG, selector=selector, error=str(exc))
-    return False
+    return (await probe_page(page))["profile"]
 
 
 async def wait_until_logged_in(page, max_ms: int) -> bool:
@@ -439,7 +844,7 @@ async def wait_until_logged_in(page, max_ms: int) -> bool:
     return False
 
 
-async def ensure_logged_in(page, search_url: str, net_cfg: Dict[str, int], stats: Dict[str, int]) -> bool:
+async def ensure_logged_in(page, search_url: str, net_cfg: Dict[str, int], stats: Stats) -> bool:
     """Pastikan sesi login aktif dan halaman hasil pencarian siap."""
     if await is_logged_in(page):
         return True
@@ -451,7 +856,7 @@ async def ensure_logged_in(page, search_url: str, net_cfg: Dict[str, int], stats
     return False
 
 
-async def resilient_goto(page, url: str, net_cfg: Dict[str, int], stats: Dict[str, int]) -> bool:
+async def resilient_goto(page, url: str, net_cfg: Dict[str, int], stats: Stats) -> bool:
     """Pergi ke URL dengan retry dan backoff."""
     for attempt in range(net_cfg["max_retries"]):
         try:
@@ -475,67 +880,158 @@ async def resilient_goto(page, url: str, net_cfg: Dict[str, int], stats: Dict[st
     return False
 
 
+async def block_heavy_resources(route) -> None:
+    """Handler route Playwright: batalkan gambar/media/font dan skrip pelacak."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        hint in request.url for hint in BLOCKED_URL_HINTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 # ----------------- Pemindaian & prioritas -----------------
 
 
+# Menerima daftar handle artikel dan mengembalikan [href, epoch-ms, innerText]
+# per artikel (null bila tidak ada tautan status/waktu valid), urut sama.
+# Waktu di-parse oleh Date.parse di browser sehingga Python cukup memakai int.
+SCAN_ARTICLES_JS = """(arts) => arts.map((a) => {
+    const link = a.querySelector("a[href*='/status/']");
+    const time = a.querySelector("time");
+    if (!link || !time) return null;
+    const ms = Date.parse(time.getAttribute("datetime"));
+    if (Number.isNaN(ms)) return null;
+    const btn = a.querySelector(%s);
+    const canReply = btn !== null && btn.getAttribute("aria-disabled") !== "true";
+    return [link.getAttribute("href"), ms, a.innerText, canReply];
+})""" % json.dumps(SEL_REPLY_BTN)
+
+
+# scrollBy langsung di halaman, tanpa lewat pipeline input (Input.dispatchMouseEvent)
+SCROLL_JS = "() => window.scrollBy(0, 1000)"
+
+
+async def dispose_handles(handles: Sequence[Any]) -> None:
+    """Lepas ElementHandle sekaligus; permintaan dikirim serentak, bukan satu per satu."""
+    if handles:
+        await asyncio.gather(*(h.dispose() for h in handles), return_exceptions=True)
+
+
 async def soft_scan_cycle(
     page,
     scan_cfg: Dict[str, int],
     replied: set[int],
-    seen_ids: set[int],
-    stats: Dict[str, int],
+    seen_ids: LruSet,
+    stats: Stats,
+    now_ms: Optional[int] = None,
 ) -> List[Candidate]:
-    """Scan DOM untuk tweet baru tanpa reload."""
+    """Scan DOM untuk tweet baru tanpa reload; *now_ms* = waktu siklus (epoch ms)."""
     candidates: List[Candidate] = []
     log_event("scan_cycle_start", level=logging.DEBUG)
-    arts = await page.query_selector_all("article")
-    stats["found"] = stats.get("found", 0) + len(arts)
-    stats["found_last"] = len(arts)
-
-    for art in arts:
-        link = await art.query_selector("a[href*='/status/']")
-        if not link:
+    all_arts = await page.query_selector_all(SEL_ARTICLE)
+    stats.inc("found", len(all_arts))
+    stats.set("found_last", len(all_arts))
+    # artikel teratas adalah yang terbaru; sisanya tidak perlu dibaca tiap siklus
+    arts = all_arts[: scan_cfg["max_articles_per_cycle"]]
+    # satu round-trip untuk semua atribut artikel, bukan beberapa per artikel
+    rows = await page.evaluate(SCAN_ARTICLES_JS, arts) if arts else []
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    # batas umur dihitung sekali per siklus; per artikel cukup satu perbandingan int
+    cutoff_ms = now_ms - scan_cfg["max_age_hours"] * 3_600_000
+
+    for art, row in zip(arts, rows):
+        if not row:
             continue
-        href = await link.get_attribute("href")
+        href, created_ms, text, can_reply = row
         if not href:
             continue
+        # href berbentuk "/USER/status/ID"
+        parts = href.split("/", 3)
+        if len(parts) < 4:
+            continue
         try:
-            tid = int(href.split("/")[-1])
+            tid = int(parts[3].split("?", 1)[0])
         except ValueError:
             continue
-        user = href.split("/")[1]
-        if tid in seen_ids or tid in replied:
+        user = parts[1]
+        if tid in replied or not seen_ids.add(tid):
             continue
-        tm = await art.query_selector("time")
-        if not tm:
+        created_ms = int(created_ms)
+        if created_ms < cutoff_ms:
+            stats.inc("age")
             continue
-        ts = await tm.get_attribute("datetime")
-        if not ts:
-            continue
-        created = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        age = datetime.now(timezone.utc) - created
-        if age > timedelta(hours=scan_cfg["max_age_hours"]):
-            stats["age"] = stats.get("age", 0) + 1
-            seen_ids.add(tid)
-            continue
-        text = await art.inner_text()
-        candidates.append(Candidate(tid, user, created, art, text))
-        seen_ids.add(tid)
-
-    # scroll ringan untuk memunculkan item baru
-    await page.mouse.wheel(0, 1000)
+        candidates.append(Candidate(tid, user, created_ms, art, text, normalize_text(text), can_reply))
+
+    # handle artikel yang tidak jadi kandidat dilepas agar tidak menumpuk di driver
+    kept = {id(c.element) for c in candidates}
+    await dispose_handles([a for a in all_arts if id(a) not in kept])
+    # scroll ringan hanya saat siklus stagnan, agar handle kandidat yang
+    # belum dibalas tidak ikut tergeser/terlepas dari DOM
+    if not candidates:
+        await page.evaluate(SCROLL_JS)
     log_event(
         "scan_cycle_end",
         level=logging.DEBUG,
         total=len(arts),
         fresh=len(candidates),
-        ignored_old=stats.get("age", 0),
+        ignored_old=stats.get("age"),
     )
     return candidates
 
 
+_KEY_CREATED = attrgetter("created_ms")
+
+
 def prioritize(candidates: List[Candidate]) -> List[Candidate]:
-    return sorted(candidates, key=lambda c: c.created_at, reverse=True)
+    """Urutkan kandidat dari yang terbaru."""
+    return sorted(candidates, key=_KEY_CREATED, reverse=True)
+
+
+async def classify_candidates(
+    cands: List[Candidate], stats: Stats, timeout_ms: int, concurrency: int
+) -> List[str]:
+    """Label AI per kandidat, urut sama dengan *cands*.
+
+    Label dari cache ai dipakai langsung; sisanya diklasifikasi bersamaan
+    lewat ai.classify_texts (maks. *concurrency* panggilan serentak), yang
+    juga menyimpan hasilnya ke cache. Bila AI tidak tersedia, kandidat
+    dianggap pembeli.
+    """
+    labels: List[str] = []
+    misses: List[int] = []
+    for i, cand in enumerate(cands):
+        cached = cached_label(cand.text)
+        if cached is None:
+            misses.append(i)
+            labels.append(LABEL_BUYER)
+            continue
+        labels.append(cached)
+        log_event(
+            "ai_cache_hit",
+            level=logging.DEBUG,
+            tweet_id=cand.tid,
+            author=cand.author,
+            label=cached,
+        )
+
+    if not misses:
+        return labels
+    results = await classify_texts(
+        [cands[i].text for i in misses], timeout_ms=timeout_ms, concurrency=concurrency
+    )
+    for i, (res, elapsed_ms) in zip(misses, results):
+        cand = cands[i]
+        if res is None:
+            stats.inc("ai_disabled")
+            logging.warning("AI classification unavailable; proceeding without filter")
+            log_event("ai_unavailable", tweet_id=cand.tid, author=cand.author, latency_ms=elapsed_ms)
+            continue
+        labels[i] = res
+        log_event("ai_classify", tweet_id=cand.tid, author=cand.author, label=res, latency_ms=elapsed_ms)
+    return labels
 
 
 # ------------------- Balasan & log --------------------
@@ -548,16 +1044,14 @@ async def attempt_reply(
     reply_cfg: Dict[str, int],
     state: Dict[str, Any],
     replied: set[int],
-    stats: Dict[str, int],
-    timers: Dict[str, List[int]],
+    stats: Stats,
+    stop_evt: Optional[asyncio.Event] = None,
 ) -> ReplyResult:
-    if cand.tid in replied:
-        stats["duplicate"] = stats.get("duplicate", 0) + 1
-        return ReplyResult("skip", "duplicate")
-
-    btn = await cand.element.query_selector("[data-testid='reply']")
+    if stop_evt is not None and stop_evt.is_set():
+        return ReplyResult("skip", "stopped")
+    btn = await cand.element.query_selector(SEL_REPLY_BTN)
     if not btn or await btn.get_attribute("aria-disabled") == "true":
-        stats["skip_tombol"] = stats.get("skip_tombol", 0) + 1
+        stats.inc("skip_tombol")
         return ReplyResult("skip", "skip_tombol")
 
     log_event(
@@ -571,9 +1065,13 @@ async def attempt_reply(
     try:
         await btn.click(timeout=reply_cfg["click_timeout_ms"])
         t1 = time.perf_counter()
-        await page.wait_for_selector("div[role='textbox']", timeout=reply_cfg["composer_timeout_ms"])
+        await page.wait_for_selector(SEL_COMPOSER, timeout=reply_cfg["composer_timeout_ms"])
         t2 = time.perf_counter()
-        await page.fill("div[role='textbox']", reply_msg)
+        if stop_evt is not None and stop_evt.is_set():
+            # berhenti diminta saat composer terbuka; tutup tanpa mengirim
+            await page.keyboard.press("Escape")
+            return ReplyResult("skip", "stopped")
+        await page.fill(SEL_COMPOSER, reply_msg)
         if state["dry_run"]:
             await page.keyboard.press("Escape")
             result = ReplyResult(
@@ -586,16 +1084,16 @@ async def attempt_reply(
             )
             log_event("reply_dry_run", tweet_id=cand.tid, author=cand.author, durations=result.durations)
             return result
-        send_btn = await page.query_selector("[data-testid='tweetButton']")
+        send_btn = await page.query_selector(SEL_SUBMIT)
         if not send_btn or await send_btn.get_attribute("aria-disabled") == "true":
-            stats["skip_closed"] = stats.get("skip_closed", 0) + 1
+            stats.inc("skip_closed")
             await page.keyboard.press("Escape")
             log_event("reply_closed", tweet_id=cand.tid, author=cand.author)
             return ReplyResult("skip", "reply_closed")
         await send_btn.click(timeout=reply_cfg["submit_timeout_ms"])
         t3 = time.perf_counter()
     except TimeoutError:
-        stats["net_error"] = stats.get("net_error", 0) + 1
+        stats.inc("net_error")
         log_event("reply_timeout", level=logging.WARNING, tweet_id=cand.tid, author=cand.author)
         return ReplyResult("skip", "net_error")
 
@@ -606,10 +1104,10 @@ async def attempt_reply(
     }
 
     try:
-        toast = await page.wait_for_selector("[data-testid='toast']", timeout=2000)
+        toast = await page.wait_for_selector(SEL_TOAST, timeout=2000)
         msg = (await toast.inner_text()).lower() if toast else ""
         if "reply" in msg and ("can't" in msg or "cannot" in msg or "tidak" in msg):
-            stats["skip_closed"] = stats.get("skip_closed", 0) + 1
+            stats.inc("skip_closed")
             await page.keyboard.press("Escape")
             log_event("reply_closed_toast", tweet_id=cand.tid, author=cand.author, message=msg)
             return ReplyResult("skip", "reply_closed", durations)
@@ -617,30 +1115,50 @@ async def attempt_reply(
         pass
 
     for k, v in durations.items():
-        timers.setdefault(k, []).append(v)
-        if len(timers[k]) > 10:
-            timers[k] = timers[k][-10:]
+        stats.time(k, v)
 
     replied.add(cand.tid)
-    save_replied(list(replied))
-    stats["replied"] = stats.get("replied", 0) + 1
+    append_replied(cand.tid, replied)
+    stats.inc("replied")
     log_event("reply_sent", tweet_id=cand.tid, author=cand.author, durations=durations)
     return ReplyResult("reply", "balas_ok", durations)
 
 
+def write_record(path: str, data: Dict[str, Any]) -> None:
+    """Tulis satu record JSONL lewat penulis batch jurnal; langsung bila jurnal belum aktif."""
+    line = dumps_json(data)
+    if EVENT_JOURNAL is not None:
+        EVENT_JOURNAL.append_line(line, path)
+        return
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as exc:
+        logging.warning("Gagal menulis log %s: %s", path, exc)
+        log_event("record_log_failed", level=logging.WARNING, path=path, error=str(exc))
+
+
 def record_decision(
     cand: Candidate,
     res: ReplyResult,
     path: str = "decisions.log",
     extra: Optional[Dict[str, Any]] = None,
+    ts: Optional[str] = None,
+    now_ms: Optional[int] = None,
 ) -> None:
+    """Catat keputusan per kandidat.
+
+    *ts* dan *now_ms* diisi waktu siklus agar jam tidak dibaca ulang per kandidat.
+    """
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
     text_excerpt = " ".join(cand.text.split())[:200]
     data: Dict[str, Any] = {
-        "ts": datetime.utcnow().isoformat() + "Z",
+        "ts": ts or _event_ts(),
         "tweet_id": cand.tid,
         "author": cand.author,
         "tweet_url": f"https://x.com/{cand.author}/status/{cand.tid}",
-        "age_min": int((datetime.now(timezone.utc) - cand.created_at).total_seconds() / 60),
+        "age_min": (now_ms - cand.created_ms) // 60_000,
         "action": res.action,
         "reason": res.reason,
         "dur_ms": res.durations,
@@ -648,13 +1166,7 @@ def record_decision(
     }
     if extra:
         data["meta"] = extra
-    try:
-        with open(path, "a", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False)
-            f.write("\n")
-    except Exception as exc:
-        logging.warning("Gagal menulis log keputusan: %s", exc)
-        log_event("decision_log_failed", level=logging.WARNING, error=str(exc))
+    write_record(path, data)
     log_event("decision", **data)
 
 
@@ -666,9 +1178,10 @@ def record_cycle(
     refreshed: bool,
     path: str = "cycles.log",
     stats_snapshot: Optional[Dict[str, int]] = None,
+    ts: Optional[str] = None,
 ) -> None:
     data: Dict[str, Any] = {
-        "ts": datetime.utcnow().isoformat() + "Z",
+        "ts": ts or _event_ts(),
         "cycle": cycle,
         "found": found,
         "new_candidates": new_candidates,
@@ -677,48 +1190,39 @@ def record_cycle(
     }
     if stats_snapshot:
         data["stats"] = stats_snapshot
-    try:
-        with open(path, "a", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False)
-            f.write("\n")
-    except Exception as exc:
-        logging.warning("Gagal menulis log siklus: %s", exc)
-        log_event("cycle_log_failed", level=logging.WARNING, error=str(exc))
+    write_record(path, data)
     log_event("cycle", **data)
 
 
 # ---------------- Dashboard & input -----------------
 
 
+DASH_HEADERS = ("Ditemukan", "Calon Balas", "Sudah Balas", "Skip Kata", "Skip Tombol")
+
+
 def render_dashboard(
-    stats: Dict[str, int],
-    timers: Dict[str, List[int]],
+    stats: Stats,
     status: Dict[str, Any],
-    activity: List[str],
+    activity: Deque[str],
 ) -> Panel:
-    table = Table(box=box.SIMPLE_HEAVY, expand=True)
-    headers = [
-        "Ditemukan",
-        "Calon Balas",
-        "Sudah Balas",
-        "Skip Kata",
-        "Skip Tombol",
-    ]
-    for h in headers:
-        table.add_column(h, justify="center")
     row = [
-        str(stats.get("found", 0)),
-        str(stats.get("cand", 0)),
-        str(stats.get("replied", 0)),
-        str(stats.get("skip_kata", 0)),
-        str(stats.get("skip_tombol", 0)),
+        str(stats.get("found")),
+        str(stats.get("cand")),
+        str(stats.get("replied")),
+        str(stats.get("skip_kata")),
+        str(stats.get("skip_tombol")),
     ]
+    # renderable dibuat baru tiap render: Live menggambar dari thread lain,
+    # jadi objek yang sedang ditampilkan tidak boleh diubah di tempat
+    table = Table(box=box.SIMPLE_HEAVY, expand=True)
+    for header in DASH_HEADERS:
+        table.add_column(header, justify="center")
     table.add_row(*row)
 
-    lines = [f"Terlalu Lama: {stats.get('age', 0)}"]
+    lines = [f"Terlalu Lama: {stats.get('age')}"]
     if status.get("ai_enabled"):
-        lines.append(f"Ambigu AI: {stats.get('ai_amb', 0)}")
-        lines.append(f"AI Fallback: {stats.get('ai_disabled', 0)}")
+        lines.append(f"Ambigu AI: {stats.get('ai_amb')}")
+        lines.append(f"AI Fallback: {stats.get('ai_disabled')}")
     last = status.get("last_activity")
     if last:
         user, ts = last
@@ -732,7 +1236,7 @@ def render_dashboard(
 
     summary = Text("\n".join(lines))
 
-    log_lines = activity[-5:]
+    log_lines = list(activity)[-DASH_LOG_LINES:]
     log_text = Text("\n".join(log_lines) if log_lines else "-")
     log_panel = Panel(log_text, title="Log Aktivitas", padding=(0, 1))
 
@@ -740,23 +1244,77 @@ def render_dashboard(
     return Panel(grp, padding=0)
 
 
-async def key_listener(state: Dict[str, Any]) -> None:
-    """Listener non-blocking untuk input keyboard."""
-    while True:
-        ch = await asyncio.to_thread(sys.stdin.read, 1)
-        ch = ch.strip().lower()
-        if ch == "p":
-            state["paused"] = not state["paused"]
-            log_event("key_toggle_pause", paused=state["paused"])
-        elif ch == "r":
-            state["force_refresh"] = True
-            log_event("key_force_refresh")
-        elif ch == "d":
-            state["dry_run"] = not state["dry_run"]
-            log_event("key_toggle_dry_run", dry_run=state["dry_run"])
-        elif ch == "q":
-            state["quit"] = True
-            log_event("key_quit")
+def handle_key(ch: str, state: Dict[str, Any], quit_evt: asyncio.Event) -> None:
+    """Terapkan satu tombol kontrol ke *state*."""
+    ch = ch.strip().lower()
+    if ch == "p":
+        state["paused"] = not state["paused"]
+        log_event("key_toggle_pause", paused=state["paused"])
+    elif ch == "r":
+        state["force_refresh"] = True
+        log_event("key_force_refresh")
+    elif ch == "d":
+        state["dry_run"] = not state["dry_run"]
+        log_event("key_toggle_dry_run", dry_run=state["dry_run"])
+    elif ch == "q":
+        quit_evt.set()
+        log_event("key_quit")
+
+
+async def key_listener(state: Dict[str, Any], quit_evt: asyncio.Event) -> None:
+    """Listener non-blocking untuk input keyboard.
+
+    Di POSIX, stdin dipasang ke event loop (mode cbreak) tanpa thread; di
+    Windows atau bila stdin bukan TTY, jatuh ke pembacaan lewat thread.
+    """
+    if sys.platform == "win32" or not sys.stdin.isatty():
+        while True:
+            ch = await asyncio.to_thread(sys.stdin.read, 1)
+            if not ch:
+                return  # EOF (mis. stdin </dev/null): berhenti, jangan berputar terus
+            handle_key(ch, state, quit_evt)
+
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    loop = asyncio.get_running_loop()
+    saved_attrs = termios.tcgetattr(fd)
+
+    def on_stdin() -> None:
+        data = os.read(fd, 1)
+        if not data:
+            loop.remove_reader(fd)
+            return
+        handle_key(data.decode("utf-8", errors="ignore"), state, quit_evt)
+
+    tty.setcbreak(fd)
+    loop.add_reader(fd, on_stdin)
+    try:
+        await loop.create_future()  # aktif sampai task dibatalkan
+    finally:
+        loop.remove_reader(fd)
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved_attrs)
+
+
+def install_stop_signals(quit_evt: asyncio.Event) -> None:
+    """SIGINT/SIGTERM menghentikan bot secara rapi lewat *quit_evt*.
+
+    Sinyal kedua memakai perilaku bawaan (KeyboardInterrupt) agar bot tetap
+    bisa dipaksa berhenti bila langkah yang sedang berjalan macet.
+    """
+    loop = asyncio.get_running_loop()
+
+    def on_signal(sig: signal.Signals) -> None:
+        loop.remove_signal_handler(sig)
+        quit_evt.set()
+        log_event("signal_stop", signal=sig.name)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, on_signal, sig)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: tetap andalkan KeyboardInterrupt
 
 
 # ----------------------------- Main loop -----------------------------
@@ -767,195 +1325,234 @@ async def run() -> None:
     load_env()
     cfg = load_config()
     setup_logging(cfg["logging"])
-    global SEARCH_URL
-    SEARCH_URL = build_search_url(cfg)
-    pos_kws = [normalize_text(k) for k in cfg.get("positive_keywords", [])]
-    neg_kws = [normalize_text(k) for k in cfg.get("negative_keywords", [])]
+    search_url = build_search_url(cfg)
+    pos_kws = KeywordMatcher([normalize_text(k) for k in cfg.get("positive_keywords", [])])
+    neg_kws = KeywordMatcher([normalize_text(k) for k in cfg.get("negative_keywords", [])])
     reply_msg = cfg.get("reply_message", "")
 
     ai_enabled = cfg.get("ai_enabled", False)
     ai_timeout = cfg.get("ai_timeout_ms", 4000)
+    set_ai_cache_ttl(int(cfg.get("ai_cache_ttl_ms", AI_CACHE_TTL_MS)) / 1000)
+    # batasi panggilan AI serentak per siklus agar tetap di bawah rate limit
+    ai_concurrency = max(1, int(cfg.get("ai_concurrency", 4)))
     pre_filter = cfg.get("pre_filter_keywords", True)
     if ai_enabled and not ensure_api_key():
         log_event("bot_stop_missing_api_key")
         return
+    # pemanasan koneksi AI berjalan paralel dengan peluncuran browser & login
+    ai_warmup = asyncio.create_task(warmup_ai()) if ai_enabled else None
 
-    scan_cfg = cfg["scan"]
-    net_cfg = cfg["network"]
-    reply_cfg = cfg["reply"]
-
-    replied = set(load_replied())
-    seen_ids: set[int] = set()
-    stats: Dict[str, int] = {}
-    timers: Dict[str, List[int]] = {"scan_cycle": []}
-    state = {"paused": False, "force_refresh": False, "dry_run": reply_cfg.get("dry_run", False), "quit": False}
-    last_activity: Optional[tuple[str, datetime]] = None
-    activity: List[str] = []
-
-    pw = await async_playwright().start()
-    browser = await pw.chromium.launch_persistent_context(
-        user_data_dir=SESSION_DIR, headless=False, args=["--start-maximized"]
-    )
-    page = browser.pages[0] if browser.pages else await browser.new_page()
-
-    # buka halaman login dan tunggu sampai benar-benar masuk
-    await resilient_goto(page, LOGIN_URL, net_cfg, stats)
-    login_spinner = Spinner("dots", text="Menunggu login…")
-    with Live(login_spinner, console=console, refresh_per_second=10):
-        logged = await wait_until_logged_in(page, 120000)
-    if not logged:
-        console.print("[bold red]Gagal login.[/]")
-        log_event("login_failed")
-        await browser.close()
-        await pw.stop()
-        return
-    log_event("login_success")
-
-    await resilient_goto(page, SEARCH_URL, net_cfg, stats)
-    work_spinner = Spinner("line")
-
-    if cfg["dashboard"].get("interactive_keys", True):
-        asyncio.create_task(key_listener(state))
-
-    cycle = 0
-    no_new = 0
-
-    with Live(console=console, refresh_per_second=4, screen=True) as live:
-        while not state["quit"]:
-            start = time.perf_counter()
-            logged_in = await ensure_logged_in(page, SEARCH_URL, net_cfg, stats)
-            if not logged_in:
-                log_event("ensure_login_failed", level=logging.WARNING)
-                await asyncio.sleep(1)
-                continue
-            try:
-                await page.wait_for_selector("article", timeout=net_cfg["timeout_ms"])
-            except TimeoutError:
-                await resilient_goto(page, SEARCH_URL, net_cfg, stats)
-                continue
-            refreshed = False
+    try:
+        scan_cfg = cfg["scan"]
+        net_cfg = cfg["network"]
+        reply_cfg = cfg["reply"]
+
+        replied = load_replied()
+        seen_ids = LruSet(SEEN_IDS_MAX)
+        stats = Stats()
+        state = {"paused": False, "force_refresh": False, "dry_run": reply_cfg.get("dry_run", False)}
+        quit_evt = asyncio.Event()
+        last_activity: Optional[tuple[str, datetime]] = None
+        activity: Deque[str] = deque(maxlen=ACTIVITY_MAX)
+
+        pw = await async_playwright().start()
+        browser = await pw.chromium.launch_persistent_context(
+            user_data_dir=SESSION_DIR, headless=False, args=["--start-maximized"]
+        )
+        if net_cfg["block_resources"]:
+            # catatan: route() mematikan cache HTTP; bundle JS diunduh ulang tiap reload
+            await browser.route("**/*", block_heavy_resources)
+            log_event("resource_blocking_enabled", types=sorted(BLOCKED_RESOURCE_TYPES))
+        page = browser.pages[0] if browser.pages else await browser.new_page()
+
+        # buka halaman login dan tunggu sampai benar-benar masuk
+        await resilient_goto(page, LOGIN_URL, net_cfg, stats)
+        login_spinner = Spinner("dots", text="Menunggu login…")
+        with Live(login_spinner, console=console, refresh_per_second=10):
+            logged = await wait_until_logged_in(page, 120000)
+        if not logged:
+            console.print("[bold red]Gagal login.[/]")
+            log_event("login_failed")
+            await browser.close()
+            await pw.stop()
+            return
+        log_event("login_success")
 
-            new_candidates: List[Candidate] = []
-            if not state["paused"]:
+        await resilient_goto(page, search_url, net_cfg, stats)
+        # locator terikat ke page, bukan ke navigasi; cukup dibuat sekali
+        art_locator = page.locator(SEL_ARTICLE)
+        work_spinner = Spinner("line")
+
+        key_task: Optional[asyncio.Task[None]] = None
+        if cfg["dashboard"].get("interactive_keys", True):
+            key_task = asyncio.create_task(key_listener(state, quit_evt))
+        install_stop_signals(quit_evt)
+
+        cycle = 0
+        no_new = 0
+        pending_reload: Optional[asyncio.Task[Any]] = None
+        # konfigurasi tidak berubah selama berjalan; baca sekali di luar loop
+        scan_interval_ms = scan_cfg["scan_interval_ms"]
+        max_scan_interval_ms = max(scan_interval_ms, scan_cfg["max_scan_interval_ms"])
+        current_sleep_ms = scan_interval_ms
+        refresh_threshold = scan_cfg["no_new_cycles_before_refresh"]
+        net_timeout = net_cfg["timeout_ms"]
+
+        with Live(console=console, refresh_per_second=4, screen=True) as live:
+            while not quit_evt.is_set():
+                if pending_reload is not None:
+                    try:
+                        await pending_reload
+                    except Exception as exc:
+                        log_event("reload_failed", level=logging.WARNING, error=str(exc))
+                        await resilient_goto(page, search_url, net_cfg, stats)
+                    pending_reload = None
+                start = time.perf_counter()
+                cycle_s = time.time()
+                cycle_ms = int(cycle_s * 1000)
+                cycle_iso = datetime.fromtimestamp(cycle_s, _UTC).strftime(ISO_TS_FORMAT)
+                logged_in = await ensure_logged_in(page, search_url, net_cfg, stats)
+                if not logged_in:
+                    log_event("ensure_login_failed", level=logging.WARNING)
+                    await asyncio.sleep(1)
+                    continue
                 try:
-                    cands = await soft_scan_cycle(page, scan_cfg, replied, seen_ids, stats)
-                    stats["cand"] = stats.get("cand", 0) + len(cands)
-                    for cand in prioritize(cands):
-                        norm_text = normalize_text(cand.text)
-                        if pre_filter and not passes_prefilter(norm_text, pos_kws, neg_kws):
-                            stats["skip_kata"] = stats.get("skip_kata", 0) + 1
-                            record_decision(
-                                cand,
-                                ReplyResult("skip", "prefilter"),
-                                extra={"prefilter": True},
-                            )
-                            activity.append(f"@{cand.author} skip: kata")
-                            if len(activity) > 10:
-                                activity.pop(0)
-                            continue
-                        label = "pembeli"
-                        if ai_enabled:
-                            cache_key = norm_text
-                            now_ms = int(time.time() * 1000)
-                            cached = AI_CACHE.get(cache_key)
-                            if cached and now_ms - cached[1] < AI_CACHE_TTL_MS:
-                                label = cached[0]
-                                log_event(
-                                    "ai_cache_hit",
-                                    level=logging.DEBUG,
-                                    tweet_id=cand.tid,
-                                    author=cand.author,
-                                    label=label,
+                    await art_locator.first.wait_for(timeout=net_timeout)
+                except TimeoutError:
+                    await resilient_goto(page, search_url, net_cfg, stats)
+                    continue
+                refreshed = False
+
+                new_candidates: List[Candidate] = []
+                cands: List[Candidate] = []
+                if not state["paused"]:
+                    try:
+                        cands = await soft_scan_cycle(page, scan_cfg, replied, seen_ids, stats, cycle_ms)
+                        stats.inc("cand", len(cands))
+                        survivors: List[Candidate] = []
+                        for cand in prioritize(cands):
+                            if quit_evt.is_set():
+                                break
+                            if pre_filter and not passes_prefilter(cand.norm_text, pos_kws, neg_kws):
+                                stats.inc("skip_kata")
+                                record_decision(
+                                    cand,
+                                    ReplyResult("skip", "prefilter"),
+                                    extra={"prefilter": True},
+                                    ts=cycle_iso,
+                                    now_ms=cycle_ms,
                                 )
-                            else:
-                                ai_start = time.perf_counter()
-                                res = await classify_text(cand.text, timeout_ms=ai_timeout)
-                                elapsed_ms = int((time.perf_counter() - ai_start) * 1000)
-                                if res is None:
-                                    stats["ai_disabled"] = stats.get("ai_disabled", 0) + 1
-                                    logging.warning(
-                                        "AI classification unavailable; proceeding without filter"
-                                    )
-                                    log_event(
-                                        "ai_unavailable",
-                                        tweet_id=cand.tid,
-                                        author=cand.author,
-                                        latency_ms=elapsed_ms,
-                                    )
-                                else:
-                                    label = res
-                                    AI_CACHE[cache_key] = (label, now_ms)
-                                    log_event(
-                                        "ai_classify",
-                                        tweet_id=cand.tid,
-                                        author=cand.author,
-                                        label=label,
-                                        latency_ms=elapsed_ms,
-                                    )
-                            if label != "pembeli":
-                                stats["ai_amb"] = stats.get("ai_amb", 0) + 1
+                                activity.append(f"@{cand.author} skip: kata")
+                                continue
+                            if not cand.can_reply:
+                                # tombol balas sudah diketahui nonaktif; jangan habiskan panggilan AI
+                                stats.inc("skip_tombol")
+                                record_decision(
+                                    cand, ReplyResult("skip", "skip_tombol"), ts=cycle_iso, now_ms=cycle_ms
+                                )
+                                activity.append(f"@{cand.author} skip: skip_tombol")
+                                continue
+                            survivors.append(cand)
+
+                        labels = [LABEL_BUYER] * len(survivors)
+                        if ai_enabled and survivors and not quit_evt.is_set():
+                            labels = await classify_candidates(survivors, stats, ai_timeout, ai_concurrency)
+                        for cand, label in zip(survivors, labels):
+                            if quit_evt.is_set():
+                                break
+                            if label != LABEL_BUYER:
+                                stats.inc("ai_amb")
                                 record_decision(
                                     cand,
                                     ReplyResult("skip", "ai_amb"),
                                     extra={"ai_label": label},
+                                    ts=cycle_iso,
+                                    now_ms=cycle_ms,
                                 )
                                 activity.append(f"@{cand.author} skip: ai_amb")
-                                if len(activity) > 10:
-                                    activity.pop(0)
                                 continue
 
-                        res = await attempt_reply(page, cand, reply_msg, reply_cfg, state, replied, stats, timers)
-                        record_decision(cand, res)
-                        activity.append(f"@{cand.author} {res.action}: {res.reason}")
-                        if len(activity) > 10:
-                            activity.pop(0)
-                        if res.action == "reply":
-                            last_activity = (cand.author, datetime.now())
-                    new_candidates = cands
-                except Exception as exc:
-                    logging.exception("Kesalahan saat memproses kandidat; lanjut ke siklus berikutnya")
-                    log_exception("candidate_loop_failed", exc)
-
-            dur = int((time.perf_counter() - start) * 1000)
-            timers["scan_cycle"].append(dur)
-            if len(timers["scan_cycle"]) > 10:
-                timers["scan_cycle"] = timers["scan_cycle"][-10:]
-
-            if not new_candidates:
-                no_new += 1
-                if state["force_refresh"] or no_new >= scan_cfg["no_new_cycles_before_refresh"]:
-                    await page.reload()
-                    refreshed = True
-                    state["force_refresh"] = False
+                            res = await attempt_reply(
+                                page, cand, reply_msg, reply_cfg, state, replied, stats, quit_evt
+                            )
+                            record_decision(cand, res, ts=cycle_iso, now_ms=cycle_ms)
+                            activity.append(f"@{cand.author} {res.action}: {res.reason}")
+                            if res.action == "reply":
+                                last_activity = (cand.author, datetime.now())
+                        new_candidates = cands
+                    except Exception as exc:
+                        log_exception(
+                            "candidate_loop_failed",
+                            exc,
+                            message="Kesalahan saat memproses kandidat; lanjut ke siklus berikutnya",
+                        )
+                    # siklus berikut memindai ulang DOM; handle kandidat tidak dipakai lagi
+                    await dispose_handles([c.element for c in cands])
+
+                dur = int((time.perf_counter() - start) * 1000)
+                stats.time("scan_cycle", dur)
+
+                if not new_candidates:
+                    no_new += 1
+                    # timeline sepi: perlambat polling bertahap sampai batas atas
+                    current_sleep_ms = min(max_scan_interval_ms, int(current_sleep_ms * SCAN_BACKOFF_FACTOR))
+                    if state["force_refresh"] or no_new >= refresh_threshold:
+                        # reload berjalan selama render & jeda; ditunggu di awal siklus berikut
+                        pending_reload = asyncio.create_task(page.reload())
+                        refreshed = True
+                        state["force_refresh"] = False
+                        no_new = 0
+                        current_sleep_ms = scan_interval_ms
+                else:
                     no_new = 0
-            else:
-                no_new = 0
-
-            status = {
-                "last_activity": last_activity,
-                "url": SEARCH_URL,
-                "logged_in": logged_in,
-                "ai_enabled": ai_enabled,
-                "cycle_dur": dur,
-                "spinner": work_spinner,
-            }
-            live.update(render_dashboard(stats, timers, status, activity))
-
-            cycle += 1
-            record_cycle(
-                cycle,
-                stats.get("found_last", 0),
-                len(new_candidates),
-                dur,
-                refreshed,
-                stats_snapshot=dict(stats),
-            )
+                    current_sleep_ms = scan_interval_ms
+
+                status = {
+                    "last_activity": last_activity,
+                    "url": search_url,
+                    "logged_in": logged_in,
+                    "ai_enabled": ai_enabled,
+                    "cycle_dur": dur,
+                    "spinner": work_spinner,
+                }
+                live.update(render_dashboard(stats, status, activity))
+
+                cycle += 1
+                if ai_enabled and cycle % AI_CACHE_SWEEP_EVERY == 0:
+                    swept = ai_cache_sweep()
+                    if swept:
+                        log_event("ai_cache_swept", level=logging.DEBUG, removed=swept, size=len(AI_CACHE))
+                record_cycle(
+                    cycle,
+                    stats.get("found_last"),
+                    len(new_candidates),
+                    dur,
+                    refreshed,
+                    stats_snapshot=stats.changed(),
+                    ts=cycle_iso,
+                )
+
+                # jeda antar siklus, tetapi langsung bangun begitu 'q' ditekan
+                try:
+                    await asyncio.wait_for(quit_evt.wait(), timeout=current_sleep_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
 
-            await asyncio.sleep(scan_cfg["scan_interval_ms"] / 1000)
+        if key_task is not None:
+            key_task.cancel()
+            await asyncio.gather(key_task, return_exceptions=True)
+        if pending_reload is not None:
+            await asyncio.gather(pending_reload, return_exceptions=True)
 
-    await browser.close()
-    await pw.stop()
-    log_event("bot_stop")
+        await browser.close()
+        await pw.stop()
+        log_event("bot_stop")
+    finally:
+        # juga saat login gagal/exception: tunggu warmup & tutup pool HTTP dan fd
+        if ai_warmup is not None:
+            await asyncio.gather(ai_warmup, return_exceptions=True)
+        await close_ai()
+        close_replied()
 
 
 if __name__ == "__main__":